@@ -1,49 +1,66 @@
-import json
+import asyncio
+import mmap
 import os
+import sys
 import time
 import heapq
-from itertools import combinations
-from typing import List, Optional, Dict
-from backend.models import Product, Order
-from pydantic import ValidationError
+from collections import Counter, defaultdict
+from operator import itemgetter
+import orjson
+from typing import List, Optional, Dict, Any, DefaultDict, Tuple
+from backend.models import Product, Order, OrderItem
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
 # Global In-Memory Database
 PRODUCTS: List[Product] = []
+PRODUCTS_BY_ID: Dict[str, Product] = {}
 ORDERS: List[Order] = []
+# Bumped on every load_data() so caches derived from the catalog can tell a
+# reload apart from the catalog they were built on
+_CATALOG_VERSION = 0
 
 # --- RECOMMENDATION ENGINE (Co-Occurrence Graph) ---
 # Map<TargetID, Map<RelatedID, Frequency>>
 # Example: "101": { "102": 5, "105": 2 }
-CO_PURCHASE_MAP: Dict[str, Dict[str, int]] = {}
+CO_PURCHASE_MAP: DefaultDict[str, Counter] = defaultdict(Counter)
+
+# Top-K related products per target, ranked once after the graph is built.
+# Example: "101": ["102", "105"]
+MAX_RECOMMENDATIONS = 10
+TOP_K_REC: Dict[str, List[str]] = {}
+
+def _update_cooccurrence(order: Order, graph: DefaultDict[str, Counter]) -> None:
+    """Adds every product pair of a single order to the co-occurrence graph."""
+    # Get unique items in this order to avoid self-linking
+    item_ids = list({item.product_id for item in order.items})
+    if len(item_ids) < 2:
+        return
+    
+    for p1 in item_ids:
+        # Counter.update counts the whole row in C, so the M^2 pair work never
+        # runs as Python bytecode. It also counts p1 itself exactly once,
+        # which is dropped straight away.
+        related = graph[p1]
+        related.update(item_ids)
+        del related[p1]
 
 def build_recommendation_graph(orders: List[Order]) -> None:
     """
     Analyzes order history to build a co-occurrence matrix.
     Time Complexity: O(K * M^2) where K=Orders, M=Items per order.
-    Optimized with itertools.combinations for faster execution.
+    Only O(K * M) steps run in Python; each row of pair counts is added in C.
     """
-    global CO_PURCHASE_MAP
     CO_PURCHASE_MAP.clear()
     
     start_time = time.time()
     logger.info("Building recommendation graph...")
     
     for order in orders:
-        # Get unique items in this order to avoid self-linking
-        item_ids = list({item.product_id for item in order.items})
-        
-        # Use itertools.combinations for cleaner, faster pair generation
-        for p1, p2 in combinations(item_ids, 2):
-            # Link p1 -> p2
-            if p1 not in CO_PURCHASE_MAP: CO_PURCHASE_MAP[p1] = {}
-            CO_PURCHASE_MAP[p1][p2] = CO_PURCHASE_MAP[p1].get(p2, 0) + 1
-            
-            # Link p2 -> p1 (Symmetric)
-            if p2 not in CO_PURCHASE_MAP: CO_PURCHASE_MAP[p2] = {}
-            CO_PURCHASE_MAP[p2][p1] = CO_PURCHASE_MAP[p2].get(p1, 0) + 1
+        _update_cooccurrence(order, CO_PURCHASE_MAP)
+    
+    _rank_recommendations()
     
     duration = time.time() - start_time
     logger.info(
@@ -51,87 +68,169 @@ def build_recommendation_graph(orders: List[Order]) -> None:
         f"Duration: {duration:.3f}s"
     )
 
+def _rank_recommendations() -> None:
+    """
+    Precomputes TOP_K_REC from CO_PURCHASE_MAP.
+    The graph is static after loading, so ranking is paid once per neighbor
+    list (O(N log k) via heapq) instead of on every request.
+    """
+    TOP_K_REC.clear()
+    for product_id, neighbors in CO_PURCHASE_MAP.items():
+        top_neighbors = heapq.nlargest(MAX_RECOMMENDATIONS, neighbors.items(), key=itemgetter(1))
+        TOP_K_REC[product_id] = [pid for pid, count in top_neighbors]
+
 def get_recommended_product_ids(product_id: str, limit: int = 3) -> List[str]:
     """
     Returns the top N product IDs frequently bought with the given product.
-    Time Complexity: O(N log k) where N=neighbors, k=limit (optimized with heapq).
+    Time Complexity: O(k) lookup into the precomputed ranking (k <= MAX_RECOMMENDATIONS).
     """
-    if product_id not in CO_PURCHASE_MAP:
-        return []
-    
-    neighbors = CO_PURCHASE_MAP[product_id]
-    
-    # heapq.nlargest is O(N log k) instead of O(N log N) for sorted()
-    # Significantly faster when k << N (e.g., limit=3, neighbors=50)
-    top_neighbors = heapq.nlargest(limit, neighbors.items(), key=lambda item: item[1])
-    
-    return [pid for pid, count in top_neighbors]
+    return TOP_K_REC.get(product_id, [])[:limit]
+
+def _update_popularity(order: Order, frequency_map: Counter) -> None:
+    """Counts each product at most ONCE for the given order."""
+    # Use a set to count a product only ONCE per order
+    frequency_map.update({item.product_id for item in order.items})
+
+def apply_popularity_scores(products: List[Product], frequency_map: Dict[str, int]) -> None:
+    for product in products:
+        product.popularity_score = frequency_map.get(product.id, 0)
 
 def calculate_popularity_scores(products: List[Product], orders: List[Order]) -> None:
     """
     Calculates popularity based on ORDER FREQUENCY (Unique Orders).
     """
-    frequency_map: Dict[str, int] = {}  # ProductID -> Count of Orders it appeared in
+    frequency_map: Counter = Counter()  # ProductID -> Count of Orders it appeared in
 
     for order in orders:
-        # Use a set to count a product only ONCE per order
-        unique_items_in_order = {item.product_id for item in order.items}
-        
-        for product_id in unique_items_in_order:
-            frequency_map[product_id] = frequency_map.get(product_id, 0) + 1
+        _update_popularity(order, frequency_map)
 
-    for product in products:
-        product.popularity_score = frequency_map.get(product.id, 0)
+    apply_popularity_scores(products, frequency_map)
 
-def load_data():
-    global PRODUCTS, ORDERS
-    
-    start_time = time.time()
-    logger.info("Loading data files...")
-    
-    # Get absolute path to data directory
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(base_dir, 'data')
-    
-    products_path = os.path.join(data_dir, 'products.json')
-    orders_path = os.path.join(data_dir, 'orders.json')
+# --- TRUSTED LOADERS ---
+# The data files are application-owned, so records are built with
+# model_construct, which skips per-field validation. Request-path models
+# keep full Pydantic validation.
+#
+# model_construct does not enforce required fields either, so each record is
+# checked for its model's required (on-disk, camelCase) keys first. A missing
+# key raises KeyError, which the loaders report as a schema error.
+def _required_keys(model: Any) -> frozenset:
+    return frozenset(info.alias or name for name, info in model.model_fields.items() if info.is_required())
 
-    # 1. Load Products
+_PRODUCT_REQUIRED = _required_keys(Product)
+_ORDER_REQUIRED = _required_keys(Order)
+_ORDER_ITEM_REQUIRED = _required_keys(OrderItem)
+
+def _check_required(raw: Dict[str, Any], required: frozenset) -> None:
+    if not required <= raw.keys():
+        raise KeyError(f"missing {sorted(required - raw.keys())}")
+
+def _construct_product(raw: Dict[str, Any]) -> Product:
+    _check_required(raw, _PRODUCT_REQUIRED)
+    # Low-cardinality values: interned so every product shares one string
+    # object per category/brand and equality checks hit the identity fast path
+    raw['category'] = sys.intern(raw['category'])
+    raw['brand'] = sys.intern(raw['brand'])
+    return Product.model_construct(**raw)
+
+def _construct_order(raw: Dict[str, Any]) -> Order:
+    _check_required(raw, _ORDER_REQUIRED)
+    # model_construct does not recurse, so nested items are built explicitly
+    items = []
+    for item in raw['items']:
+        _check_required(item, _ORDER_ITEM_REQUIRED)
+        items.append(OrderItem.model_construct(**item))
+    return Order.model_construct(**{**raw, 'items': items})
+
+def _read_json(path: str) -> Any:
+    """
+    Parses a JSON file straight from a read-only memory map, so the file is
+    handed to orjson from the page cache without first being copied into a
+    Python bytes object.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and non-mappable streams cannot be mmapped
+            return orjson.loads(f.read())
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _load_products_file(products_path: str) -> List[Product]:
     try:
-        with open(products_path, 'r') as f:
-            data = json.load(f)
-            PRODUCTS = [Product(**item) for item in data]
-            logger.info(f"Loaded {len(PRODUCTS)} products from {products_path}")
+        data = _read_json(products_path)
+        products = [_construct_product(item) for item in data]
+        logger.info(f"Loaded {len(products)} products from {products_path}")
+        return products
     except FileNotFoundError:
         logger.error(f"CRITICAL: products.json not found at {products_path}")
-        PRODUCTS = []
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"CRITICAL: products.json corrupt - {e}")
-        PRODUCTS = []
-    except ValidationError as e:
+    except (KeyError, TypeError) as e:
         logger.error(f"CRITICAL: Invalid product data schema - {e}")
-        PRODUCTS = []
+    return []
 
-    # 2. Load Orders
+def _load_orders_file(orders_path: str) -> Tuple[List[Order], Counter]:
+    """
+    Loads orders and builds the co-purchase graph in the same pass.
+    Returns the orders and their product frequency map; popularity is applied
+    by the caller once products are available.
+    """
+    # Raw dicts are popped as they are consumed so the parsed JSON is
+    # released incrementally instead of living alongside the orders.
+    frequency_map: Counter = Counter()
+    CO_PURCHASE_MAP.clear()
+    TOP_K_REC.clear()
     try:
-        with open(orders_path, 'r') as f:
-            orders_data = json.load(f)
-            ORDERS = [Order(**item) for item in orders_data]
-            logger.info(f"Loaded {len(ORDERS)} orders from {orders_path}")
-            
-            # --- CALCULATE METRICS ---
-            calculate_popularity_scores(PRODUCTS, ORDERS)
-            build_recommendation_graph(ORDERS)
+        orders_data = _read_json(orders_path)
+        
+        orders: List[Order] = []
+        orders_data.reverse()
+        while orders_data:
+            order = _construct_order(orders_data.pop())
+            orders.append(order)
+            _update_popularity(order, frequency_map)
+            _update_cooccurrence(order, CO_PURCHASE_MAP)
+        logger.info(f"Loaded {len(orders)} orders from {orders_path}")
+        
+        _rank_recommendations()
+        logger.info(f"Recommendation graph built: {len(CO_PURCHASE_MAP)} products tracked")
+        return orders, frequency_map
             
     except FileNotFoundError:
         logger.warning(f"orders.json not found at {orders_path}. Analytics disabled.")
-        ORDERS = []
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.warning(f"orders.json corrupt - {e}. Analytics disabled.")
-        ORDERS = []
-    except ValidationError as e:
+    except (KeyError, TypeError) as e:
         logger.warning(f"Invalid order data schema - {e}. Analytics disabled.")
-        ORDERS = []
+        CO_PURCHASE_MAP.clear()
+    return [], Counter()
+
+async def load_data():
+    global PRODUCTS, PRODUCTS_BY_ID, ORDERS, _CATALOG_VERSION
+    
+    start_time = time.time()
+    logger.info("Loading data files...")
+    
+    # Get absolute path to data directory
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(base_dir, 'data')
+    
+    products_path = os.path.join(data_dir, 'products.json')
+    orders_path = os.path.join(data_dir, 'orders.json')
+
+    # The two files are independent: read and parse them in worker threads
+    # so their disk I/O overlaps instead of running back to back.
+    PRODUCTS, (ORDERS, frequency_map) = await asyncio.gather(
+        asyncio.to_thread(_load_products_file, products_path),
+        asyncio.to_thread(_load_orders_file, orders_path),
+    )
+    PRODUCTS_BY_ID = {p.id: p for p in PRODUCTS}
+
+    # --- CALCULATE METRICS ---
+    apply_popularity_scores(PRODUCTS, frequency_map)
+    _CATALOG_VERSION += 1
     
     total_duration = time.time() - start_time
     logger.info(f"Data loading complete | Duration: {total_duration:.3f}s")
@@ -139,5 +238,11 @@ def load_data():
 def get_all_products() -> List[Product]:
     return PRODUCTS
 
+def get_catalog_version() -> int:
+    return _CATALOG_VERSION
+
+def get_product_by_id(product_id: str) -> Optional[Product]:
+    return PRODUCTS_BY_ID.get(product_id)
+
 def get_all_orders() -> List[Order]:
     return ORDERS
\ No newline at end of file
@@ -1,28 +1,70 @@
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
+# Background thread draining log records into the real (blocking) handlers
+_LISTENER: Optional[QueueListener] = None
+# The root handler feeding that listener, removed again on shutdown
+_QUEUE_HANDLER: Optional[QueueHandler] = None
+
 def setup_logging(log_level: Optional[str] = None) -> None:
     """
     Configure application-wide logging.
     
+    Records are put on an in-memory queue by a QueueHandler and written to
+    stdout by a QueueListener thread, so request handlers never block on
+    stream I/O.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    global _LISTENER, _QUEUE_HANDLER
     level = getattr(logging, (log_level or "INFO").upper(), logging.INFO)
     
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(
+        fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    # Message only: level/time/name are added once, by the stream handler
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
     logging.basicConfig(
         level=level,
-        format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
+        handlers=[queue_handler]
     )
     
+    # basicConfig is a no-op when the root logger is already configured;
+    # only start draining the queue if our handler was actually installed.
+    if queue_handler in logging.getLogger().handlers:
+        _LISTENER = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _LISTENER.start()
+        _QUEUE_HANDLER = queue_handler
+    
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
 
+def shutdown_logging() -> None:
+    """
+    Flush queued records, stop the background listener and detach the queue
+    handler from the root logger, so a later setup_logging() (e.g. a second
+    app lifespan in the same process) configures logging from scratch
+    instead of enqueuing into a queue nothing drains.
+    """
+    global _LISTENER, _QUEUE_HANDLER
+    if _QUEUE_HANDLER is not None:
+        logging.getLogger().removeHandler(_QUEUE_HANDLER)
+        _QUEUE_HANDLER.close()
+        _QUEUE_HANDLER = None
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance for a module."""
     return logging.getLogger(name)
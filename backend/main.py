@@ -1,14 +1,16 @@
 from fastapi import FastAPI, Query, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from typing import List
 from contextlib import asynccontextmanager
 from pydantic import ValidationError
+import asyncio
+import logging
 import time
 
-from backend.logger import setup_logging, get_logger
-from backend.product_service import filter_products, get_faceted_metadata
-from backend.database import load_data, get_recommended_product_ids, get_all_products
+from backend.logger import setup_logging, shutdown_logging, get_logger
+from backend.product_service import filter_products, get_faceted_metadata, filter_and_facet, page_json, products_json, warm_catalog
+from backend.database import load_data, get_recommended_product_ids, get_product_by_id
 from backend.models import Product
 
 logger = get_logger(__name__)
@@ -17,24 +19,30 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("Starting application...")
-    load_data()
+    await load_data()
+    # Index eagerly (off the event loop) instead of on the first search
+    await asyncio.to_thread(warm_catalog)
     logger.info("Application startup complete")
     yield
     logger.info("Application shutdown")
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     response = await call_next(request)
     
-    duration = time.time() - start_time
+    if not logger.isEnabledFor(logging.INFO):
+        return response
+    
+    duration = (time.perf_counter_ns() - start_time) / 1e9
+    # %-style args: formatting is deferred to the handler, not done per request
     logger.info(
-        f"{request.method} {request.url.path} | "
-        f"Status: {response.status_code} | "
-        f"Duration: {duration:.3f}s"
+        "%s %s | Status: %d | Duration: %.3fs",
+        request.method, request.url.path, response.status_code, duration
     )
     
     return response
@@ -87,7 +95,7 @@ def get_products(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page")
 ):
-    return filter_products(
+    result = filter_products(
         search=q,
         categories=category,
         brands=brand,
@@ -98,6 +106,8 @@ def get_products(
         page=page,
         limit=limit
     )
+    # Pre-serialized product fragments; skips per-request model_dump + encoding
+    return Response(content=page_json(result), media_type="application/json")
 
 @app.get("/api/metadata")
 def get_metadata(
@@ -117,9 +127,39 @@ def get_metadata(
         availability=availability
     )
 
+@app.get("/api/catalog")
+def get_catalog(
+    q: str = Query(None, max_length=200, description="Search query"),
+    category: List[str] = Query(None, description="Filter by categories"),
+    brand: List[str] = Query(None, description="Filter by brands"),
+    minPrice: float = Query(None, ge=0, le=1000000, description="Minimum price"),
+    maxPrice: float = Query(None, ge=0, le=1000000, description="Maximum price"),
+    sort: str = Query(None, description="Sort order"),
+    availability: str = Query(None, pattern="^(in-stock|sold-out)$", description="Availability filter"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page")
+):
+    """Combined /api/products page and /api/metadata facets in one request."""
+    result = filter_and_facet(
+        search=q,
+        categories=category,
+        brands=brand,
+        min_price=minPrice,
+        max_price=maxPrice,
+        sort_by=sort,
+        availability=availability,
+        page=page,
+        limit=limit
+    )
+    return Response(content=page_json(result), media_type="application/json")
+
 @app.get("/api/products/{product_id}/recommendations", response_model=List[Product])
 def get_recommendations(product_id: str):
     rec_ids = get_recommended_product_ids(product_id, limit=3)
-    all_products = get_all_products()
-    recs = [p for p in all_products if p.id in rec_ids]
-    return recs
\ No newline at end of file
+    # O(k) id lookups; keeps the ranking order from the recommendation engine
+    recs = [get_product_by_id(pid) for pid in rec_ids]
+    # response_model stays for the OpenAPI schema; the body is pre-serialized
+    return Response(
+        content=products_json([p for p in recs if p is not None]),
+        media_type="application/json"
+    )
\ No newline at end of file
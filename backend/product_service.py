@@ -1,74 +1,416 @@
-from typing import List, Optional, Dict, Set, Any
+from typing import List, Optional, Dict, Set, Any, Tuple, Iterable
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
 from backend.models import Product
-from backend.database import get_all_products
+from backend.database import get_all_products, get_catalog_version
 import re
+import heapq
 import traceback
 import time
+import orjson
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
 # --- INVERTED INDEX STORAGE ---
-SEARCH_INDEX: Dict[str, Set[str]] = {}
+SEARCH_INDEX: Dict[str, List[int]] = {}  # token -> ascending catalog rows
 IS_INDEX_BUILT = False
 
 # --- NORMALIZATION LOGIC ---
+_PUNCT_PATTERN = re.compile(r'[^\w\s]')
+# ASCII fast path: one 256-entry bytes.translate table that lowercases and
+# blanks out exactly what _PUNCT_PATTERN would, in a single C pass. Catalog
+# text is almost entirely ASCII; anything else falls back to the regex.
+_ASCII_TABLE = bytes(
+    ord(' ') if _PUNCT_PATTERN.match(chr(c)) else ord(chr(c).lower())
+    for c in range(128)
+) + bytes(range(128, 256))
+
+def _strip_punctuation(text: str) -> str:
+    """Lowercases text and blanks out punctuation (whitespace left as is)."""
+    text = str(text)  # Ensure string
+    if text.isascii():
+        return text.encode('ascii').translate(_ASCII_TABLE).decode('ascii')
+    return _PUNCT_PATTERN.sub(' ', text.lower())
+
 def normalize_text(text: str) -> str:
     """Normalize text for search indexing and matching."""
     if not text:
         return ""
-    text = str(text).lower()  # Ensure string
-    text = re.sub(r'[^\w\s]', ' ', text)
-    return " ".join(text.split())
+    return " ".join(_strip_punctuation(text).split())
 
 def normalize_tokens(text: str) -> Set[str]:
-    normalized = normalize_text(text)
-    return set(normalized.split())
+    # Split straight into the set; re-joining first would only be split again
+    if not text:
+        return set()
+    return set(_strip_punctuation(text).split())
 
+@lru_cache(maxsize=4096)
 def normalize_key(text: str) -> str:
+    # Category/brand vocabularies are small and bounded, so every catalog
+    # value and filter argument is normalized once and then served from cache.
     return normalize_text(text)
 
 # --- INDEXING LOGIC ---
+def _product_tokens(product: Product) -> Set[str]:
+    content = f"{product.name} {product.description} {product.brand} {product.category}"
+    return normalize_tokens(content)
+
 def build_search_index(products: List[Product]) -> None:
-    """Build inverted index for fast search."""
+    """
+    Build inverted index for fast search.
+    Posting lists are ascending catalog row numbers, kept sparse: most
+    tokens occur in a handful of products, so a per-token N-bit bitmap
+    would cost O(tokens x N) to build and hold. Queries pack only their
+    final match set into a bitmap.
+    """
     global SEARCH_INDEX, IS_INDEX_BUILT
     
     start_time = time.time()
     logger.info(f"Building search index for {len(products)} products...")
     
+    postings: Dict[str, List[int]] = {}
+    for row, product in enumerate(products):
+        for token in _product_tokens(product):
+            if token not in postings:
+                postings[token] = []
+            postings[token].append(row)
     SEARCH_INDEX.clear()
-    for product in products:
-        content = f"{product.name} {product.description} {product.brand} {product.category}"
-        tokens = normalize_tokens(content)
-        for token in tokens:
-            if token not in SEARCH_INDEX:
-                SEARCH_INDEX[token] = set()
-            SEARCH_INDEX[token].add(product.id)
+    SEARCH_INDEX.update(postings)
     IS_INDEX_BUILT = True
     
     duration = time.time() - start_time
     logger.info(f"Search index built: {len(SEARCH_INDEX)} unique tokens | Duration: {duration:.3f}s")
 
-def search_with_index(query: str, all_products: List[Product]) -> List[Product]:
-    global IS_INDEX_BUILT
+def add_product_to_index(product: Product, row: int) -> None:
+    """Adds one product at the given catalog row. O(tokens in the product)."""
+    for token in _product_tokens(product):
+        if token in SEARCH_INDEX:
+            SEARCH_INDEX[token].append(row)
+        else:
+            SEARCH_INDEX[token] = [row]
+
+def _search_rows(query_tokens: Set[str], all_products: List[Product]) -> int:
+    """
+    Bitmap of the rows of all_products matching every query token.
+    Callers normalize the query once at the request boundary.
+    """
+    if not query_tokens:
+        return 0
     if not IS_INDEX_BUILT or not SEARCH_INDEX:
         build_search_index(all_products)
-    
-    query_tokens = normalize_tokens(query)
-    if not query_tokens:
-        return []
 
-    candidate_ids: Optional[Set[str]] = None
+    postings = []
     for token in query_tokens:
-        matches = SEARCH_INDEX.get(token, set())
-        if candidate_ids is None:
-            candidate_ids = matches
+        matches = SEARCH_INDEX.get(token)
+        if not matches:
+            return 0
+        postings.append(matches)
+
+    # Smallest posting list first: the running result only shrinks, so
+    # every later intersection probes the sparsest set available.
+    postings.sort(key=len)
+    candidate_rows = set(postings[0])
+    for matches in postings[1:]:
+        candidate_rows.intersection_update(matches)
+        if not candidate_rows:
+            return 0
+    return _rows_to_mask(candidate_rows, len(all_products))
+
+# --- COLUMNAR CATALOG (SoA) ---
+# Parallel per-field columns over the catalog, index-aligned with
+# _CACHED_CATALOG, so the filter hot path reads flat lists instead of going
+# through Pydantic attribute access on every product.
+# Row sets are Python ints used as bitmaps (bit i <=> catalog row i): AND/OR
+# and popcount run in C over machine words, giving NumPy-style boolean masks
+# without a NumPy dependency.
+PRICES: List[float] = []
+RATINGS: List[float] = []
+POPULARITY: List[int] = []
+ALL_MASK = 0
+IN_STOCK_MASK = 0
+CATEGORY_MASKS: Dict[str, int] = {}  # normalized category -> rows
+BRAND_MASKS: Dict[str, int] = {}     # normalized brand -> rows
+# Facet posting lists, keyed by display name, and their names in facet order
+CATEGORY_NAME_MASKS: Dict[str, int] = {}
+BRAND_NAME_MASKS: Dict[str, int] = {}
+CATEGORIES_SORTED: List[str] = []
+BRANDS_SORTED: List[str] = []
+# Per-row integer codes into CATEGORIES_SORTED / BRANDS_SORTED
+CATEGORY_CODES: List[int] = []
+BRAND_CODES: List[int] = []
+_PRICE_ORDER: List[int] = []         # rows sorted by price (for range masks)
+_SORTED_PRICES: List[float] = []
+
+def _rows_to_mask(rows: Iterable[int], size: int) -> int:
+    """Packs row numbers into a bitmap via a '0'/'1' buffer (linear time)."""
+    if not size:
+        return 0
+    bits = bytearray(b'0') * size
+    for row in rows:
+        bits[size - 1 - row] = 49  # ord('1'); most significant bit first
+    return int(bits, 2)
+
+def _mask_to_rows(mask: int) -> List[int]:
+    """Unpacks a bitmap into ascending row numbers (catalog order)."""
+    bits = bin(mask)[:1:-1]  # least significant bit first, '0b' dropped
+    rows = []
+    row = bits.find('1')
+    while row != -1:
+        rows.append(row)
+        row = bits.find('1', row + 1)
+    return rows
+
+def _build_columns(products: List[Product]) -> None:
+    global PRICES, RATINGS, POPULARITY, ALL_MASK, IN_STOCK_MASK
+    global _PRICE_ORDER, _SORTED_PRICES, CATEGORIES_SORTED, BRANDS_SORTED
+    global CATEGORY_CODES, BRAND_CODES
+    
+    size = len(products)
+    PRICES = [p.price for p in products]
+    RATINGS = [p.rating for p in products]
+    POPULARITY = [p.popularity_score for p in products]
+    ALL_MASK = (1 << size) - 1
+    IN_STOCK_MASK = _rows_to_mask((i for i, p in enumerate(products) if p.in_stock), size)
+
+    category_rows: Dict[str, List[int]] = {}
+    brand_rows: Dict[str, List[int]] = {}
+    category_name_rows: Dict[str, List[int]] = {}
+    brand_name_rows: Dict[str, List[int]] = {}
+    for i, p in enumerate(products):
+        category_rows.setdefault(normalize_key(p.category), []).append(i)
+        brand_rows.setdefault(normalize_key(p.brand), []).append(i)
+        category_name_rows.setdefault(p.category, []).append(i)
+        brand_name_rows.setdefault(p.brand, []).append(i)
+    for masks, rows_by_key in (
+        (CATEGORY_MASKS, category_rows),
+        (BRAND_MASKS, brand_rows),
+        (CATEGORY_NAME_MASKS, category_name_rows),
+        (BRAND_NAME_MASKS, brand_name_rows),
+    ):
+        masks.clear()
+        masks.update({k: _rows_to_mask(rows, size) for k, rows in rows_by_key.items()})
+    CATEGORIES_SORTED = sorted(CATEGORY_NAME_MASKS)
+    BRANDS_SORTED = sorted(BRAND_NAME_MASKS)
+    category_code = {name: code for code, name in enumerate(CATEGORIES_SORTED)}
+    brand_code = {name: code for code, name in enumerate(BRANDS_SORTED)}
+    CATEGORY_CODES = [category_code[p.category] for p in products]
+    BRAND_CODES = [brand_code[p.brand] for p in products]
+
+    _PRICE_ORDER = sorted(range(size), key=PRICES.__getitem__)
+    _SORTED_PRICES = [PRICES[i] for i in _PRICE_ORDER]
+
+def _price_mask(min_price: Optional[float], max_price: Optional[float]) -> int:
+    lo = 0 if min_price is None else bisect_left(_SORTED_PRICES, min_price)
+    hi = len(_SORTED_PRICES) if max_price is None else bisect_right(_SORTED_PRICES, max_price)
+    if hi <= lo:
+        return 0
+    size = len(_SORTED_PRICES)
+    # Pack whichever side of the range is smaller
+    if hi - lo <= size // 2:
+        return _rows_to_mask(_PRICE_ORDER[lo:hi], size)
+    return ALL_MASK ^ _rows_to_mask(_PRICE_ORDER[:lo] + _PRICE_ORDER[hi:], size)
+
+def _price_bounds(mask: int) -> Tuple[float, float]:
+    """
+    Lowest and highest price among the rows of mask.
+    A sparse mask (e.g. a narrow search) takes min/max over its own rows.
+    A dense one is read off the price column's sort order instead: the first
+    and last set rows in that order are the answer, found after roughly
+    size / count probes from each end.
+    """
+    if not mask:
+        return 0, 0
+    count = mask.bit_count()
+    size = len(_PRICE_ORDER)
+    # Visiting every row costs ~count steps, probing ~size / count per end
+    if count * count <= 2 * size:
+        prices = [PRICES[row] for row in _mask_to_rows(mask)]
+        return min(prices), max(prices)
+    bits = bin(mask)[:1:-1].ljust(size, '0')  # bits[row] == '1' <=> row in mask
+    lo = next(i for i, row in enumerate(_PRICE_ORDER) if bits[row] == '1')
+    hi = next(i for i in range(size - 1, lo - 1, -1) if bits[_PRICE_ORDER[i]] == '1')
+    return _SORTED_PRICES[lo], _SORTED_PRICES[hi]
+
+def _facet_counts(names: List[str], name_masks: Dict[str, int], codes: List[int], ctx: int) -> List[Dict[str, Any]]:
+    """
+    Non-zero counts of each facet value within ctx, in name order.
+    A sparse context is tallied per row over the integer codes (a bincount);
+    otherwise each value costs one AND + popcount against its posting list.
+    """
+    if ctx.bit_count() < len(names):
+        counts = [0] * len(names)
+        for row in _mask_to_rows(ctx):
+            counts[codes[row]] += 1
+    else:
+        counts = [(name_masks[name] & ctx).bit_count() for name in names]
+    return [{"name": name, "count": count} for name, count in zip(names, counts) if count]
+
+def _search_mask(search: Optional[str]) -> int:
+    """Rows matching the search query (every row for an empty query)."""
+    # isspace() tests for a blank query without building a stripped copy
+    if not search or search.isspace():
+        return ALL_MASK
+    return _search_rows(normalize_tokens(search), _CACHED_CATALOG or [])
+
+def _lookup_mask(masks: Dict[str, int], values: Tuple[str, ...]) -> int:
+    mask = 0
+    for value in values:
+        mask |= masks.get(normalize_key(value), 0)
+    return mask
+
+# --- RESULT CACHE ---
+# Matching rows are cached per filter combination, and rankings per
+# (filters, sort, depth), so every page of a query and every sort over the
+# same filters reuse the filter work. The caches, the columns and the search
+# index are tied to the catalog list they were computed from and are rebuilt
+# whenever get_all_products() hands back a different list, e.g. after
+# load_data().
+_CACHED_CATALOG: Optional[List[Product]] = None
+_CACHED_CATALOG_SIZE = 0
+_CACHED_CATALOG_VERSION = 0
+
+def _sync_catalog(products: List[Product]) -> None:
+    global _CACHED_CATALOG, _CACHED_CATALOG_SIZE, _CACHED_CATALOG_VERSION, IS_INDEX_BUILT
+    version = get_catalog_version()
+    if (
+        products is not _CACHED_CATALOG
+        or len(products) != _CACHED_CATALOG_SIZE
+        or version != _CACHED_CATALOG_VERSION
+    ):
+        _dimension_masks.cache_clear()
+        _filter_impl.cache_clear()
+        _ranked_rows.cache_clear()
+        _facets_impl.cache_clear()
+        _JSON_FRAGMENTS.clear()
+        if (
+            products is _CACHED_CATALOG
+            and version == _CACHED_CATALOG_VERSION
+            and len(products) > _CACHED_CATALOG_SIZE
+            and IS_INDEX_BUILT
+        ):
+            # Appended to in place: existing rows keep their numbers, so
+            # only the new products need indexing.
+            for row in range(_CACHED_CATALOG_SIZE, len(products)):
+                add_product_to_index(products[row], row)
         else:
-            candidate_ids = candidate_ids.intersection(matches)
-        if not candidate_ids:
-            return []
-
-    return [p for p in all_products if p.id in candidate_ids]
+            IS_INDEX_BUILT = False
+        _build_columns(products)
+        _CACHED_CATALOG = products
+        _CACHED_CATALOG_SIZE = len(products)
+        _CACHED_CATALOG_VERSION = version
+
+def warm_catalog() -> None:
+    """
+    Builds the catalog columns and the search index ahead of the first
+    request, so no visitor pays the indexing cost. The lazy build in
+    _search_rows remains the fallback.
+    """
+    products = get_all_products()
+    _sync_catalog(products)
+    if not IS_INDEX_BUILT:
+        build_search_index(products)
+
+def _as_key(values: Optional[List[str]]) -> Tuple[str, ...]:
+    """Hashable, order-independent form of a multi-select filter."""
+    return tuple(sorted(values)) if values else ()
+
+FilterKey = Tuple[
+    Optional[str], Tuple[str, ...], Tuple[str, ...],
+    Optional[float], Optional[float], Optional[str]
+]
+
+@lru_cache(maxsize=512)
+def _dimension_masks(
+    search: Optional[str],
+    categories: Tuple[str, ...],
+    brands: Tuple[str, ...],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    availability: Optional[str]
+) -> Tuple[int, int, int, int, int]:
+    """
+    One row mask per filter dimension: (search, category, brand, price,
+    availability), each covering every row when that filter is inactive.
+    Shared by the result filter and the facets, so a listing and its facet
+    request compute them once.
+    """
+    search_mask = _search_mask(search)
+    cat_mask = _lookup_mask(CATEGORY_MASKS, categories) if categories else ALL_MASK
+    brand_mask = _lookup_mask(BRAND_MASKS, brands) if brands else ALL_MASK
+    if min_price is not None or max_price is not None:
+        price_mask = _price_mask(min_price, max_price)
+    else:
+        price_mask = ALL_MASK
+    if availability == "in-stock":
+        avail_mask = IN_STOCK_MASK
+    elif availability == "sold-out":
+        avail_mask = ALL_MASK ^ IN_STOCK_MASK
+    else:
+        avail_mask = ALL_MASK
+    return search_mask, cat_mask, brand_mask, price_mask, avail_mask
+
+@lru_cache(maxsize=512)
+def _filter_impl(
+    search: Optional[str],
+    categories: Tuple[str, ...],
+    brands: Tuple[str, ...],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    availability: Optional[str]
+) -> Tuple[int, ...]:
+    """Catalog rows matching the filters, in catalog order."""
+    search_mask, cat_mask, brand_mask, price_mask, avail_mask = _dimension_masks(
+        search, categories, brands, min_price, max_price, availability
+    )
+    mask = search_mask & cat_mask & brand_mask & price_mask & avail_mask
+    return tuple(_mask_to_rows(mask))
+
+@lru_cache(maxsize=512)
+def _ranked_rows(filters: FilterKey, sort_by: Optional[str], depth: int) -> Tuple[int, ...]:
+    """
+    The first `depth` matching rows in sort order.
+    Rows come out of _filter_impl in catalog order and every ranking below is
+    stable, so ties keep their catalog order.
+    """
+    rows = _filter_impl(*filters)
+    column = {
+        "price_asc": PRICES, "price_desc": PRICES,
+        "rating": RATINGS, "popular": POPULARITY,
+    }.get(sort_by)
+    if column is None:
+        return rows
+    ascending = sort_by == "price_asc"
+    # Only the requested pages are ever rendered: select the top `depth`
+    # rows in O(N log k) instead of fully sorting the match set.
+    # heapq.nsmallest/nlargest are equivalent to sorted(...)[:depth].
+    if depth < len(rows):
+        select = heapq.nsmallest if ascending else heapq.nlargest
+        return tuple(select(depth, rows, key=column.__getitem__))
+    return tuple(sorted(rows, key=column.__getitem__, reverse=not ascending))
+
+# --- RESPONSE SERIALIZATION ---
+# Per-product JSON fragments: every Product field under its camelCase name,
+# exactly as the API returns it. products_json/page_json splice them into
+# list and page responses. The catalog is static between reloads, so each
+# product is dumped once and responses are assembled by byte concatenation
+# instead of re-running model_dump + json encoding on every request.
+_JSON_FRAGMENTS: Dict[str, bytes] = {}
+
+def product_json(product: Product) -> bytes:
+    fragment = _JSON_FRAGMENTS.get(product.id)
+    if fragment is None:
+        fragment = orjson.dumps(product.model_dump(mode="json", by_alias=True))
+        _JSON_FRAGMENTS[product.id] = fragment
+    return fragment
+
+def products_json(products: List[Product]) -> bytes:
+    return b'[' + b','.join(map(product_json, products)) + b']'
+
+def page_json(page: Dict[str, Any]) -> bytes:
+    """Serializes a filter_products() result, reusing the cached fragments."""
+    meta = orjson.dumps({k: v for k, v in page.items() if k != "items"})
+    return b'{"items":' + products_json(page["items"]) + b',' + meta[1:]
 
 # --- MAIN SERVICES ---
 
@@ -87,46 +429,58 @@ def filter_products(
     start_time = time.time()
     
     products = get_all_products()
+    _sync_catalog(products)
+    result = _page(products, search, categories, brands, min_price, max_price, sort_by, availability, page, limit)
+    
+    duration = time.time() - start_time
+    logger.info(f"Filter query: results={result['total']}, page={page}, sort={sort_by} | Duration: {duration:.3f}s")
+
+    return result
+
+def filter_products_batch(specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Runs several filter_products queries against one catalog snapshot.
+    Each spec holds filter_products keyword arguments; the catalog is fetched
+    and synced once for the whole batch instead of once per query.
+    """
+    start_time = time.time()
+
+    products = get_all_products()
+    _sync_catalog(products)
+    results = [_page(products, **spec) for spec in specs]
 
-    if search and search.strip():
-        products = search_with_index(search, products)
+    duration = time.time() - start_time
+    logger.info(f"Filter batch: queries={len(specs)} | Duration: {duration:.3f}s")
 
-    if categories:
-        target_cats = {normalize_key(c) for c in categories}
-        products = [p for p in products if normalize_key(p.category) in target_cats]
-    
-    if brands:
-        target_brands = {normalize_key(b) for b in brands}
-        products = [p for p in products if normalize_key(p.brand) in target_brands]
+    return results
 
-    if min_price is not None:
-        products = [p for p in products if p.price >= min_price]
-    
-    if max_price is not None:
-        products = [p for p in products if p.price <= max_price]
-
-    if availability:
-        if availability == "in-stock":
-            products = [p for p in products if p.in_stock]
-        elif availability == "sold-out":
-            products = [p for p in products if not p.in_stock]
-
-    if sort_by == "price_asc":
-        products.sort(key=lambda p: p.price)
-    elif sort_by == "price_desc":
-        products.sort(key=lambda p: p.price, reverse=True)
-    elif sort_by == "rating":
-        products.sort(key=lambda p: p.rating, reverse=True)
-    elif sort_by == "popular":
-        products.sort(key=lambda p: p.popularity_score, reverse=True)
-
-    total_count = len(products)
+def _page(
+    products: List[Product],
+    search: Optional[str] = None,
+    categories: Optional[List[str]] = None,
+    brands: Optional[List[str]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort_by: Optional[str] = None,
+    availability: Optional[str] = None,
+    page: int = 1,
+    limit: int = 15
+) -> Dict[str, Any]:
+    """One page of results from an already synced catalog."""
+    if not products:
+        # Nothing to search, filter or rank: skip the index and the caches
+        return {"items": [], "total": 0, "page": page, "limit": limit, "total_pages": 0}
+
+    filters = (
+        search, _as_key(categories), _as_key(brands),
+        min_price, max_price, availability
+    )
+
+    total_count = len(_filter_impl(*filters))
     start = (page - 1) * limit
     end = start + limit
-    paginated_items = products[start:end]
-    
-    duration = time.time() - start_time
-    logger.info(f"Filter query: results={total_count}, page={page}, sort={sort_by} | Duration: {duration:.3f}s")
+    ranked = _ranked_rows(filters, sort_by, end)
+    paginated_items = [products[i] for i in ranked[start:end]]
 
     return {
         "items": paginated_items,
@@ -144,106 +498,61 @@ def get_faceted_metadata(
     max_price: Optional[float] = None,
     availability: Optional[str] = None
 ) -> Dict[str, Any]:
-    
+    """
+    Facet counts and price bounds for the given filters.
+    Results are cached per filter combination until the catalog changes, so
+    the common unfiltered (homepage) request is a cache hit. The returned
+    dict is shared between callers and must not be mutated.
+    """
     start_time = time.time()
     
-    all_products = get_all_products()
+    _sync_catalog(get_all_products())
+    facets = _facets_impl(search, _as_key(categories), _as_key(brands), min_price, max_price, availability)
     
-    # 1. Base Context: Search
-    if search and search.strip():
-        base_products = search_with_index(search, all_products)
-    else:
-        base_products = all_products
-
-    def apply_filters(products_list, ignore_avail=False, ignore_price=False):
-        filtered = products_list
-        
-        # Apply Availability (unless ignored)
-        if availability and not ignore_avail:
-            if availability == "in-stock":
-                filtered = [p for p in filtered if p.in_stock]
-            elif availability == "sold-out":
-                filtered = [p for p in filtered if not p.in_stock]
-        
-        # Apply Price (unless ignored)
-        if not ignore_price:
-            if min_price is not None:
-                filtered = [p for p in filtered if p.price >= min_price]
-            if max_price is not None:
-                filtered = [p for p in filtered if p.price <= max_price]
-        
-        return filtered
-
-    # Standard Global Context (Includes Price & Avail) - Used for Brands/Cats
-    global_context = apply_filters(base_products)
+    duration = time.time() - start_time
+    logger.info(f"Faceted metadata computed: categories={len(facets['categories'])}, brands={len(facets['brands'])} | Duration: {duration:.3f}s")
+
+    return facets
+
+@lru_cache(maxsize=256)
+def _facets_impl(
+    search: Optional[str],
+    categories: Tuple[str, ...],
+    brands: Tuple[str, ...],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    availability: Optional[str]
+) -> Dict[str, Any]:
+    # 1. Base Context (search) plus one row mask per filter dimension
+    base_mask, cat_mask, brand_mask, price_mask, avail_mask = _dimension_masks(
+        search, categories, brands, min_price, max_price, availability
+    )
+
+    # Each facet's context ANDs every dimension except its own (exclude-self).
+    # Counting a value is then one AND + popcount against its posting list,
+    # so the cost scales with the number of facet values, not products.
 
     # --- A. BRAND COUNTS (Ignore Brand Filter) ---
-    brand_calc_context = global_context
-    if categories:
-        target_cats = {normalize_key(c) for c in categories}
-        brand_calc_context = [p for p in brand_calc_context if normalize_key(p.category) in target_cats]
-
-    brand_counts = {}
-    for p in brand_calc_context:
-        brand_counts[p.brand] = brand_counts.get(p.brand, 0) + 1
-    
-    brand_facets = [
-        {"name": k, "count": v} 
-        for k, v in sorted(brand_counts.items())
-    ]
+    brand_ctx = base_mask & cat_mask & avail_mask & price_mask
+    brand_facets = _facet_counts(BRANDS_SORTED, BRAND_NAME_MASKS, BRAND_CODES, brand_ctx)
 
     # --- B. CATEGORY COUNTS (Ignore Category Filter) ---
-    cat_calc_context = global_context
-    if brands:
-        target_brands = {normalize_key(b) for b in brands}
-        cat_calc_context = [p for p in cat_calc_context if normalize_key(p.brand) in target_brands]
-
-    cat_counts = {}
-    for p in cat_calc_context:
-        cat_counts[p.category] = cat_counts.get(p.category, 0) + 1
-
-    cat_facets = [
-        {"name": k, "count": v} 
-        for k, v in sorted(cat_counts.items())
-    ]
+    cat_ctx = base_mask & brand_mask & avail_mask & price_mask
+    cat_facets = _facet_counts(CATEGORIES_SORTED, CATEGORY_NAME_MASKS, CATEGORY_CODES, cat_ctx)
 
     # --- C. AVAILABILITY COUNTS (Ignore Availability Filter) ---
-    avail_context = apply_filters(base_products, ignore_avail=True)
-    
-    if categories:
-        t = {normalize_key(c) for c in categories}
-        avail_context = [p for p in avail_context if normalize_key(p.category) in t]
-    if brands:
-        t = {normalize_key(b) for b in brands}
-        avail_context = [p for p in avail_context if normalize_key(p.brand) in t]
-
-    in_stock_count = sum(1 for p in avail_context if p.in_stock)
-    sold_out_count = sum(1 for p in avail_context if not p.in_stock)
+    avail_ctx = base_mask & cat_mask & brand_mask & price_mask
+    in_stock_count = (avail_ctx & IN_STOCK_MASK).bit_count()
+    sold_out_count = avail_ctx.bit_count() - in_stock_count
 
     avail_facets = [
         {"name": "In Stock", "value": "in-stock", "count": in_stock_count},
         {"name": "Sold Out", "value": "sold-out", "count": sold_out_count}
     ]
 
-    price_context = apply_filters(base_products, ignore_price=True)
-    
-    if categories:
-        t = {normalize_key(c) for c in categories}
-        price_context = [p for p in price_context if normalize_key(p.category) in t]
-    if brands:
-        t = {normalize_key(b) for b in brands}
-        price_context = [p for p in price_context if normalize_key(p.brand) in t]
-
-    if price_context:
-        prices = [p.price for p in price_context]
-        calc_min = min(prices)
-        calc_max = max(prices)
-    else:
-        calc_min = 0
-        calc_max = 0
-    
-    duration = time.time() - start_time
-    logger.info(f"Faceted metadata computed: categories={len(cat_facets)}, brands={len(brand_facets)} | Duration: {duration:.3f}s")
+    # --- D. PRICE BOUNDS (Ignore Price Filter) ---
+    price_ctx = base_mask & cat_mask & brand_mask & avail_mask
+    calc_min, calc_max = _price_bounds(price_ctx)
 
     return {
         "categories": cat_facets,
@@ -252,3 +561,30 @@ def get_faceted_metadata(
         "minPrice": calc_min,
         "maxPrice": calc_max
     }
+
+def filter_and_facet(
+    search: Optional[str] = None,
+    categories: Optional[List[str]] = None,
+    brands: Optional[List[str]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort_by: Optional[str] = None,
+    availability: Optional[str] = None,
+    page: int = 1,
+    limit: int = 15
+) -> Dict[str, Any]:
+    """
+    One page of results plus the facets for the same filters, for page loads
+    that need both. The per-dimension masks are built once and shared by the
+    listing and the facet contexts.
+    """
+    result = filter_products(
+        search=search, categories=categories, brands=brands,
+        min_price=min_price, max_price=max_price, sort_by=sort_by,
+        availability=availability, page=page, limit=limit
+    )
+    result["facets"] = get_faceted_metadata(
+        search=search, categories=categories, brands=brands,
+        min_price=min_price, max_price=max_price, availability=availability
+    )
+    return result
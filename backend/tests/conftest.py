@@ -0,0 +1,37 @@
+import pytest
+from backend.models import Product
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "needs_index_reset: start the test with an empty search index")
+    config.addinivalue_line("markers", "slow: expensive cases; deselect with -m 'not slow'")
+
+# Catalogs shared by the service tests. Each dataset is built once per
+# session and handed out as a tuple: a test that needs to change the catalog
+# copies it first.
+
+def P(**fields) -> Product:
+    """Builds a Product without validation; fixture data is known to be valid."""
+    return Product.model_construct(**fields)
+
+@pytest.fixture(scope="session")
+def chaos_data():
+    """Generates a list of products with tricky edge cases."""
+    return (
+        P(id="1", name="Standard Shoe", description="Normal", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10),
+        P(id="2", name="Expensive!", description="Pricey", price=1000000.0, category="Luxury", brand="Gucci", rating=5.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
+        P(id="3", name="SQL Injection", description="SELECT * FROM users", price=10.0, category="Hack", brand="BobbyTables", rating=1.0, in_stock=True, image_url="u", tags=[], popularity_score=0),
+        P(id="4", name="   Whitespace   ", description="   ", price=20.0, category="Messy", brand="   ", rating=2.0, in_stock=True, image_url="u", tags=[], popularity_score=1),
+        P(id="5", name="Emoji 👟", description="Fire 🔥", price=100.0, category="Cool", brand="Brand™", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=100),
+        P(id="6", name="Freebie", description="Zero price", price=0.0, category="Promo", brand="Generic", rating=3.0, in_stock=True, image_url="u", tags=[], popularity_score=500),
+    )
+
+@pytest.fixture(scope="session")
+def mock_data():
+    """A small, well-formed catalog for search and filter behaviour."""
+    return (
+        P(id="1", name="Nike Air Max", description="Running", price=100.0, category="Footwear", brand="Nike", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=10),
+        P(id="2", name="Adidas Ultraboost", description="Running shoes", price=120.0, category="Footwear", brand="Adidas", rating=4.8, in_stock=True, image_url="u", tags=[], popularity_score=50),
+        P(id="3", name="Puma T-Shirt", description="Cotton", price=30.0, category="Apparel", brand="Puma", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
+        P(id="4", name="Apple Watch", description="Tech", price=300.0, category="Electronics", brand="Apple", rating=4.9, in_stock=True, image_url="u", tags=[], popularity_score=100),
+        P(id="5", name="Generic Cable", description="Wire", price=10.0, category="Accessories", brand="Generic", rating=3.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
+    )
@@ -1,23 +1,22 @@
 import pytest
-from unittest.mock import patch
+from backend import product_service
 from backend.product_service import get_faceted_metadata
 from backend.models import Product
 
 @pytest.fixture
 def facet_mock_data():
     return [
-        Product(id="1", name="A", category="Shoes", brand="Nike", price=100, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
-        Product(id="2", name="B", category="Shoes", brand="Adidas", price=100, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
-        Product(id="3", name="C", category="Shirts", brand="Nike", price=50, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
-        Product(id="4", name="D", category="Hats", brand="Puma", price=20, in_stock=False, description="", rating=0, image_url="", popularity_score=0, tags=[]),
+        Product.model_construct(id="1", name="A", category="Shoes", brand="Nike", price=100, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
+        Product.model_construct(id="2", name="B", category="Shoes", brand="Adidas", price=100, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
+        Product.model_construct(id="3", name="C", category="Shirts", brand="Nike", price=50, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[]),
+        Product.model_construct(id="4", name="D", category="Hats", brand="Puma", price=20, in_stock=False, description="", rating=0, image_url="", popularity_score=0, tags=[]),
     ]
 
-@patch('backend.product_service.get_all_products')
-def test_facet_exclude_self_logic(mock_get, facet_mock_data):
+def test_facet_exclude_self_logic(monkeypatch, facet_mock_data):
     """
     CRITICAL: Verify that selecting a value in a filter does NOT hide its peers.
     """
-    mock_get.return_value = facet_mock_data
+    monkeypatch.setattr(product_service, "get_all_products", lambda: facet_mock_data)
 
     # Scenario: Select Category="Shoes"
     # Expectation: 
@@ -38,12 +37,11 @@ def test_facet_exclude_self_logic(mock_get, facet_mock_data):
     assert cats['Shirts'] == 1 # This must remain visible!
     assert cats['Hats'] == 1   # This must remain visible!
 
-@patch('backend.product_service.get_all_products')
-def test_availability_facets(mock_get, facet_mock_data):
+def test_availability_facets(monkeypatch, facet_mock_data):
     """
     Verify Availability counts dynamic updates.
     """
-    mock_get.return_value = facet_mock_data
+    monkeypatch.setattr(product_service, "get_all_products", lambda: facet_mock_data)
     
     # Scenario: Filter by Brand="Nike"
     # Nike items: 1 Shoe (In Stock), 1 Shirt (In Stock). Total 2.
@@ -58,4 +56,20 @@ def test_availability_facets(mock_get, facet_mock_data):
     meta_puma = get_faceted_metadata(brands=["Puma"])
     avail_puma = {a['value']: a['count'] for a in meta_puma['availability']}
     assert avail_puma['in-stock'] == 0
-    assert avail_puma['sold-out'] == 1
\ No newline at end of file
+    assert avail_puma['sold-out'] == 1
+
+def test_facets_refresh_after_catalog_reload(monkeypatch, facet_mock_data):
+    """
+    Cached facets must not outlive the catalog they were computed from,
+    even when a reload mutates the same list in place.
+    """
+    monkeypatch.setattr(product_service, "get_all_products", lambda: facet_mock_data)
+    monkeypatch.setattr(product_service, "get_catalog_version", lambda: 1)
+    brands = {b['name'] for b in get_faceted_metadata()['brands']}
+    assert 'Puma' in brands
+
+    facet_mock_data[3].brand = "Reebok"
+    monkeypatch.setattr(product_service, "get_catalog_version", lambda: 2)
+    brands = {b['name'] for b in get_faceted_metadata()['brands']}
+    assert 'Reebok' in brands
+    assert 'Puma' not in brands
@@ -1,63 +1,85 @@
+import orjson
 from starlette.testclient import TestClient
-from backend.main import app
+from backend.main import app, health_check, get_products, get_metadata
 from backend.models import Product
 import pytest
-from unittest.mock import patch
+from backend import product_service
 
-@pytest.fixture
+# Catalogs served to the app, built once at import. Each is a fixed list
+# object, so the service keeps its indexes across requests and tests.
+_API_CATALOG = [
+    Product(id="1", name="TestProduct", price=10.0, category="TestCat", brand="TestBrand", in_stock=True, description="Desc", rating=5.0, image_url="url", popularity_score=0, tags=[])
+]
+_PRICEY_CATALOG = [
+    Product(id="1", name="TestProduct", price=100.0, category="TestCat", brand="TestBrand", in_stock=True, description="Desc", rating=5.0, image_url="url", popularity_score=0, tags=[])
+]
+_FACET_CATALOG = [
+    Product(id="1", name="P1", category="TestCat", brand="TestBrand", price=10, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[])
+]
+
+@pytest.fixture(scope="session")
 def client():
+    # One client for the whole run: the app holds no per-test state, and each
+    # test installs its own catalog through monkeypatch
     return TestClient(app)
 
-def test_health_check(client):
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
+# Handlers are called directly where HTTP behaviour is not under test. Called
+# outside FastAPI, Query() defaults are not resolved, so every argument is
+# passed explicitly.
+NO_FILTERS = dict(q=None, category=None, brand=None, minPrice=None, maxPrice=None, availability=None)
+
+def test_health_check():
+    assert health_check() == {"status": "healthy"}
 
-@patch('backend.product_service.get_all_products')
-def test_get_products_integration(mock_get, client):
+def test_get_products_integration(monkeypatch):
     """
-    Hit the actual URL. Verify Pydantic serialization works over HTTP.
+    Verify the response body the route hands to the client is serialized
+    with the frontend's camelCase field names.
     """
-    mock_get.return_value = [
-        Product(id="1", name="TestProduct", price=10.0, category="TestCat", brand="TestBrand", in_stock=True, description="Desc", rating=5.0, image_url="url", popularity_score=0, tags=[])
-    ]
+    monkeypatch.setattr(product_service, "get_all_products", lambda: _API_CATALOG)
     
-    response = client.get("/api/products")
-    assert response.status_code == 200
-    data = response.json()
+    response = get_products(**NO_FILTERS, sort=None, page=1, limit=20)
+    assert response.media_type == "application/json"
+    data = orjson.loads(response.body)
     
     # Check pagination wrapper
     assert len(data['items']) == 1
     assert data['items'][0]["name"] == "TestProduct"
+    assert data['items'][0]["imageUrl"] == "url"
     assert "total" in data
 
-@patch('backend.product_service.get_all_products')
-def test_get_products_with_query_params(mock_get, client):
+def test_get_products_with_query_params(monkeypatch, client):
     """
     Verify FastAPI correctly parses query parameters from the URL string.
     """
-    mock_get.return_value = [
-        Product(id="1", name="TestProduct", price=100.0, category="TestCat", brand="TestBrand", in_stock=True, description="Desc", rating=5.0, image_url="url", popularity_score=0, tags=[])
-    ]
+    monkeypatch.setattr(product_service, "get_all_products", lambda: _PRICEY_CATALOG)
 
     response = client.get("/api/products?q=TestProduct&minPrice=50")
     assert response.status_code == 200
     
     assert len(response.json()['items']) == 1
 
-@patch('backend.product_service.get_all_products')
-def test_metadata_endpoint(mock_get, client):
-    mock_get.return_value = [
-         Product(id="1", name="P1", category="TestCat", brand="TestBrand", price=10, in_stock=True, description="", rating=0, image_url="", popularity_score=0, tags=[])
-    ]
+def test_metadata_endpoint(monkeypatch):
+    monkeypatch.setattr(product_service, "get_all_products", lambda: _FACET_CATALOG)
     
-    response = client.get("/api/metadata")
-    assert response.status_code == 200
-    data = response.json()
+    data = get_metadata(**NO_FILTERS)
     
     # Check Faceted Structure
     categories = [c['name'] for c in data["categories"]]
     assert "TestCat" in categories
     
     brands = [b['name'] for b in data["brands"]]
-    assert "TestBrand" in brands
\ No newline at end of file
+    assert "TestBrand" in brands
+
+def test_catalog_endpoint(monkeypatch, client):
+    """The combined endpoint returns the page and its facets together."""
+    monkeypatch.setattr(product_service, "get_all_products", lambda: _FACET_CATALOG)
+
+    response = client.get("/api/catalog?category=TestCat")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [item['id'] for item in data['items']] == ["1"]
+    assert data['total'] == 1
+    assert [c['name'] for c in data['facets']['categories']] == ["TestCat"]
+    assert data['facets']['minPrice'] == 10
@@ -1,158 +1,168 @@
 import pytest
-from unittest.mock import patch, MagicMock
-from backend.product_service import filter_products
+from backend.product_service import filter_products, filter_products_batch
 import backend.product_service # Import module to access globals
 from backend.models import Product
+from pydantic import ValidationError
 
 @pytest.fixture(autouse=True)
-def reset_search_index():
-    backend.product_service.IS_INDEX_BUILT = False
-    backend.product_service.SEARCH_INDEX.clear()
-
-@pytest.fixture
-def chaos_data():
-    """Generates a list of products with tricky edge cases."""
-    return [
-        Product(id="1", name="Standard Shoe", description="Normal", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10),
-        Product(id="2", name="Expensive!", description="Pricey", price=1000000.0, category="Luxury", brand="Gucci", rating=5.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-        Product(id="3", name="SQL Injection", description="SELECT * FROM users", price=10.0, category="Hack", brand="BobbyTables", rating=1.0, in_stock=True, image_url="u", tags=[], popularity_score=0),
-        Product(id="4", name="   Whitespace   ", description="   ", price=20.0, category="Messy", brand="   ", rating=2.0, in_stock=True, image_url="u", tags=[], popularity_score=1),
-        Product(id="5", name="Emoji 👟", description="Fire 🔥", price=100.0, category="Cool", brand="Brand™", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=100),
-        Product(id="6", name="Freebie", description="Zero price", price=0.0, category="Promo", brand="Generic", rating=3.0, in_stock=True, image_url="u", tags=[], popularity_score=500),
-    ]
-
-@patch('backend.product_service.get_all_products')
-@pytest.mark.parametrize("query,expected_ids", [
-    ("sql", ["3"]),
-    ("WHITESPACE", ["4"]),
-    ("1000000", []), 
-    ("DROP TABLE", []),
+def reset_search_index(request):
+    # The service rebuilds its index whenever it is handed a different
+    # catalog, so consecutive tests on the same shared dataset reuse one
+    # index. Tests that need a cold index opt in with @needs_index_reset.
+    if request.node.get_closest_marker("needs_index_reset"):
+        backend.product_service.IS_INDEX_BUILT = False
+        backend.product_service.SEARCH_INDEX.clear()
+
+# Extra rows layered on top of the shared catalogs, built once at import
+# (unvalidated, like the conftest catalogs)
+TWINS = [
+    Product.model_construct(id="8", name="Twin A", description=".", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10),
+    Product.model_construct(id="9", name="Twin B", description=".", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10)
+]
+SANDAL = Product.model_construct(id="7", name="Beach Sandal", description="Summer", price=15.0, category="Basic", brand="Nike", rating=3.5, in_stock=True, image_url="u", tags=[], popularity_score=2)
+
+# Valid in every field except the negative price
+_BAD_PRODUCT_SPEC = {
+    "id": "invalid", "name": "Bad Product", "description": "Should fail",
+    "price": -5.0, "category": "Test", "brand": "Test", "rating": 3.0,
+    "in_stock": True, "image_url": "url", "tags": [], "popularity_score": 0,
+}
+
+# Every search edge case in one place, one entry per distinct behaviour
+SEARCH_EDGE_CASES = [
+    pytest.param("sql", ["3"], id="sql"),
+    pytest.param("WHITESPACE", ["4"], id="case-insensitive"),
+    pytest.param("1000000", [], id="price-not-indexed"),
+    pytest.param("DROP TABLE", [], id="injection"),
+    pytest.param("   ", ["1", "2", "3", "4", "5", "6"], id="blank-means-no-search"),
+    # Non-ASCII and oversized queries leave the ASCII fast path
+    pytest.param("Fire 🔥", ["5"], id="emoji-with-word", marks=pytest.mark.slow),
+    pytest.param("🔥", [], id="emoji-only", marks=pytest.mark.slow),
+    pytest.param("overflow" * 5000, [], id="oversized", marks=pytest.mark.slow),
+]
+
+class TestSearchEdgeCases:
+    """Search and price edge cases, all against the shared chaos catalog."""
+
+    @pytest.fixture(autouse=True, scope="class")
+    def serve_chaos_data(self, chaos_data):
+        # Wired once for the whole class instead of once per parametrized case
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(backend.product_service, "get_all_products", lambda: chaos_data)
+            yield
+
+    @pytest.mark.parametrize("query,expected_ids", SEARCH_EDGE_CASES)
+    def test_search_edge_cases(self, query, expected_ids):
+        result = filter_products(search=query)
+        # Order is immaterial here; the length check still catches duplicates
+        assert {p.id for p in result['items']} == set(expected_ids)
+        assert len(result['items']) == len(expected_ids)
+
+    @pytest.mark.parametrize("min_price,max_price,expected_ids", [
+        (0, 0, ["6"]),               # Freebie: zero is a real bound, not "unset"
+        (49.99, 50.01, ["1"]),       # Floating-point precision around 50.0
+        (100, 10, []),               # Inverted range matches nothing
+        (None, 10, ["3", "6"]),      # Open lower bound, inclusive upper bound
+        (1000000, None, ["2"]),      # Inclusive lower bound at the validation ceiling
+    ])
+    def test_price_mathematics(self, min_price, max_price, expected_ids):
+        res = filter_products(min_price=min_price, max_price=max_price)
+        assert {p.id for p in res['items']} == set(expected_ids)
+        assert res['total'] == len(expected_ids)
+
+def test_none_inputs(monkeypatch, chaos_data):
+    """Explicit None for every filter behaves like no filters at all."""
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: chaos_data)
+    res = filter_products(search=None, categories=None, brands=None, min_price=None, max_price=None, sort_by=None, availability=None)
+    assert [p.id for p in res['items']] == [p.id for p in chaos_data]
+    assert res['total'] == 6
+
+@pytest.mark.parametrize("copies", [
+    3,  # Enough duplication to check the boundaries
+    pytest.param(100, marks=pytest.mark.slow),  # Scale check
 ])
-def test_search_edge_cases(mock_get, chaos_data, query, expected_ids):
-    mock_get.return_value = chaos_data
-    result = filter_products(search=query)
-    found_ids = sorted([p.id for p in result['items']])
-    assert found_ids == sorted(expected_ids)
-
-@patch('backend.product_service.get_all_products')
-def test_price_mathematics(mock_get, chaos_data):
-    mock_get.return_value = chaos_data
-    res = filter_products(min_price=0, max_price=0)
-    assert len(res['items']) == 1
-    assert res['items'][0].name == "Freebie"
-
-@patch('backend.product_service.get_all_products')
-def test_sort_stability(mock_get, chaos_data):
+def test_large_result_set(monkeypatch, chaos_data, copies):
+    """Duplicated rows are all kept, counted and paginated."""
+    large_dataset = list(chaos_data) * copies
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: large_dataset)
+    res = filter_products(max_price=10, limit=1000)
+    assert res['total'] == 2 * copies
+    assert len(res['items']) == 2 * copies
+
+def test_sort_stability(monkeypatch, chaos_data):
     """Test that sort maintains stable order for equal values."""
     # Add items with same price to test stability (removed negative price - now validated)
-    test_data = chaos_data + [
-        Product(id="8", name="Twin A", description=".", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10),
-        Product(id="9", name="Twin B", description=".", price=50.0, category="Basic", brand="Nike", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=10)
-    ]
-    mock_get.return_value = test_data
+    test_data = list(chaos_data) + TWINS
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: test_data)
     
     results = filter_products(sort_by="price_asc")
     items = results['items']
     
-    # Find the twins and verify stable sort order
-    twins = [p for p in items if "Twin" in p.name]
-    assert len(twins) == 2
-    assert twins[0].name == "Twin A"
-    assert twins[1].name == "Twin B"
-
-@patch('backend.product_service.get_all_products')
-def test_negative_price_validation(mock_get):
+    # Equal prices keep catalog order: Twin B directly follows Twin A
+    ids = [p.id for p in items]
+    first = ids.index("8")
+    assert items[first].name == "Twin A"
+    assert items[first + 1].name == "Twin B"
+
+def test_negative_price_validation():
     """Test that Pydantic properly rejects negative prices."""
-    from pydantic import ValidationError
-    
-    # Attempting to create Product with negative price should raise ValidationError
     with pytest.raises(ValidationError) as exc_info:
-        Product(
-            id="invalid",
-            name="Bad Product",
-            description="Should fail",
-            price=-5.0,  # This should be rejected
-            category="Test",
-            brand="Test",
-            rating=3.0,
-            in_stock=True,
-            image_url="url",
-            tags=[],
-            popularity_score=0
-        )
+        Product(**_BAD_PRODUCT_SPEC)
     
-    # Verify error mentions price
-    assert "price" in str(exc_info.value).lower()
+    # Inspect the structured errors rather than rendering the message
+    assert any(e['loc'] == ('price',) for e in exc_info.value.errors())
 
-@patch('backend.product_service.get_all_products')
-def test_empty_database(mock_get):
-    mock_get.return_value = []
+def test_empty_database(monkeypatch):
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: [])
+    def build_search_index(products):
+        pytest.fail("an empty catalog needs no search index")
+    monkeypatch.setattr(backend.product_service, "build_search_index", build_search_index)
     res = filter_products(search="Anything")
     assert res['items'] == []
     assert res['total'] == 0
 
-@patch('backend.product_service.get_all_products')
-@pytest.mark.parametrize("query,expected_count", [
-    ("Nike", 1),
-    ("nike", 1),
-    ("RUNNING", 2),
-    ("", 5),
-])
-def test_search_scenarios(mock_get, query, expected_count):
-    # Define data INSIDE the test function so index builds with THIS data
-    data = [
-        Product(id="1", name="Nike Air Max", description="Running", price=100.0, category="Footwear", brand="Nike", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=10),
-        Product(id="2", name="Adidas Ultraboost", description="Running shoes", price=120.0, category="Footwear", brand="Adidas", rating=4.8, in_stock=True, image_url="u", tags=[], popularity_score=50),
-        Product(id="3", name="Puma T-Shirt", description="Cotton", price=30.0, category="Apparel", brand="Puma", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-        Product(id="4", name="Apple Watch", description="Tech", price=300.0, category="Electronics", brand="Apple", rating=4.9, in_stock=True, image_url="u", tags=[], popularity_score=100),
-        Product(id="5", name="Generic Cable", description="Wire", price=10.0, category="Accessories", brand="Store", rating=5.0, in_stock=True, image_url="u", tags=[], popularity_score=1),
-    ]
-    mock_get.return_value = data
-    
-    results = filter_products(search=query)
-    assert len(results['items']) == expected_count
-
-@patch('backend.product_service.get_all_products')
-def test_filters_strict(mock_get):
-    data = [
-        Product(id="1", name="Nike Air Max", description="Running", price=100.0, category="Footwear", brand="Nike", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=10),
-        Product(id="2", name="Adidas Ultraboost", description="Running shoes", price=120.0, category="Footwear", brand="Adidas", rating=4.8, in_stock=True, image_url="u", tags=[], popularity_score=50),
-        Product(id="3", name="Puma T-Shirt", description="Cotton", price=30.0, category="Apparel", brand="Puma", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-        Product(id="4", name="Apple Watch", description="Tech", price=300.0, category="Electronics", brand="Apple", rating=4.9, in_stock=True, image_url="u", tags=[], popularity_score=100),
-        Product(id="5", name="Generic Cable", description="Wire", price=10.0, category="Accessories", brand="Generic", rating=3.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-    ]
-    mock_get.return_value = data
-
-    assert len(filter_products(categories=["Footwear"])['items']) == 2
-    assert len(filter_products(brands=["Nike"])['items']) == 1
-    assert len(filter_products(min_price=200)['items']) == 1
-    assert len(filter_products(brands=["NonExistent"])['items']) == 0
-
-@patch('backend.product_service.get_all_products')
-def test_complex_combination(mock_get):
-    data = [
-        Product(id="1", name="Nike Air Max", description="Running", price=100.0, category="Footwear", brand="Nike", rating=4.5, in_stock=True, image_url="u", tags=[], popularity_score=10),
-        Product(id="2", name="Adidas Ultraboost", description="Running shoes", price=120.0, category="Footwear", brand="Adidas", rating=4.8, in_stock=True, image_url="u", tags=[], popularity_score=50),
-        Product(id="3", name="Puma T-Shirt", description="Cotton", price=30.0, category="Apparel", brand="Puma", rating=4.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-        Product(id="4", name="Apple Watch", description="Tech", price=300.0, category="Electronics", brand="Apple", rating=4.9, in_stock=True, image_url="u", tags=[], popularity_score=100),
-        Product(id="5", name="Generic Cable", description="Wire", price=10.0, category="Accessories", brand="Generic", rating=3.0, in_stock=True, image_url="u", tags=[], popularity_score=5),
-    ]
-    mock_get.return_value = data
-    
-    results = filter_products(
-        search="Running", 
-        categories=["Footwear"], 
-        max_price=120, 
-        sort_by="rating"
-    )
-    
-    items = results['items']
-    assert len(items) == 2
-    assert items[0].brand == "Adidas"
+class TestFilters:
+    """Search and filter behaviour on the shared well-formed catalog."""
+
+    @pytest.fixture(autouse=True, scope="class")
+    def serve_mock_data(self, mock_data):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(backend.product_service, "get_all_products", lambda: mock_data)
+            yield
 
-@patch('backend.product_service.get_all_products')
-def test_pagination_out_of_bounds(mock_get, chaos_data):
-    mock_get.return_value = chaos_data # 6 items total
+    @pytest.mark.parametrize("query,expected_count", [
+        ("Nike", 1),
+        ("nike", 1),
+        ("RUNNING", 2),
+        ("", 5),
+    ])
+    def test_search_scenarios(self, query, expected_count):
+        results = filter_products(search=query)
+        assert len(results['items']) == expected_count
+
+    def test_filters_strict(self):
+        results = filter_products_batch([
+            {"categories": ["Footwear"]},
+            {"brands": ["Nike"]},
+            {"min_price": 200},
+            {"brands": ["NonExistent"]},
+        ])
+        assert [len(r['items']) for r in results] == [2, 1, 1, 0]
+
+    def test_complex_combination(self):
+        results = filter_products(
+            search="Running", 
+            categories=["Footwear"], 
+            max_price=120, 
+            sort_by="rating"
+        )
+        
+        items = results['items']
+        assert len(items) == 2
+        assert items[0].brand == "Adidas"
+
+def test_pagination_out_of_bounds(monkeypatch, chaos_data):
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: chaos_data) # 6 items total
     
     # Request Page 100
     res = filter_products(page=100, limit=10)
@@ -164,4 +174,18 @@ def test_pagination_out_of_bounds(mock_get, chaos_data):
     # Backend should clamp or handle gracefully (Pydantic validation usually handles this at route level, 
     # but service should allow it or fail safely).
     res_large = filter_products(page=1, limit=1000)
-    assert len(res_large['items']) == 6
\ No newline at end of file
+    assert len(res_large['items']) == 6
+
+@pytest.mark.needs_index_reset
+def test_catalog_append_is_indexed_incrementally(monkeypatch, chaos_data):
+    """Products appended to the live catalog become searchable without a full rebuild."""
+    catalog = list(chaos_data)
+    monkeypatch.setattr(backend.product_service, "get_all_products", lambda: catalog)
+    assert filter_products(search="sandal")['total'] == 0
+
+    catalog.append(SANDAL)
+    def full_rebuild(products):
+        pytest.fail("appending a product should not rebuild the whole index")
+    monkeypatch.setattr(backend.product_service, "build_search_index", full_rebuild)
+    result = filter_products(search="sandal")
+    assert [p.id for p in result['items']] == ["7"]